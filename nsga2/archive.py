@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+#
+# A implementation of: NSGA-II
+# Source: A fast and elitist multiobjective genetic algorithm: NSGA-II, 2002
+# Article author: DEB, K. et al.
+#
+# Instituto Federal de Minas Gerais - Campus Formiga, Brazil
+#
+# Version 1.0
+# (c) 2021 Thales Pinto <ThalesORP@gmail.com> under the GPL
+#          http://www.gnu.org/copyleft/gpl.html
+#
+
+'''File of the external archive class
+
+The archive is indexed by an ND-tree, from: ND-Tree-based update: a fast algorithm for
+the dynamic nondominance problem, 2018. Article author: JASZKIEWICZ, A.; LUST, T.'''
+
+from .dominance import dominance_comparison
+from . import kernels
+
+def weakly_dominates(first_solutions, second_solutions):
+    '''Tell if "first_solutions" is lower or equal than "second_solutions" in every objective'''
+
+    for first_value, second_value in zip(first_solutions, second_solutions):
+        if first_value > second_value:
+            return False
+    return True
+
+def squared_distance(first_solutions, second_solutions):
+    '''Squared euclidean distance between two solutions lists'''
+
+    return sum((first_value - second_value) ** 2
+               for first_value, second_value in zip(first_solutions, second_solutions))
+
+class NDTreeNode():
+    '''Node of the ND-tree. Leaves hold individuals, the other nodes hold children'''
+
+    def __init__(self):
+
+        # Individuals of this node, when it's a leaf
+        self.individuals = list()
+
+        self.children = list()
+
+        # Quantity of individuals in this subtree
+        self.size = 0
+
+        # Approximations of the best and worst values of each objective in this subtree.
+        # They're only widened, so they stay valid bounds after individuals are removed
+        self.ideal = None
+        self.nadir = None
+
+    def is_leaf(self):
+        '''Tell if this node holds individuals instead of children'''
+
+        return not self.children
+
+    def is_empty(self):
+        '''Tell if there's nothing left in this node'''
+
+        return not self.individuals and not self.children
+
+    def update_bounds(self, solutions):
+        '''Widen "ideal" and "nadir" to cover "solutions"'''
+
+        if self.ideal is None:
+            self.ideal = list(solutions)
+            self.nadir = list(solutions)
+            return
+
+        for i, value in enumerate(solutions):
+            if value < self.ideal[i]:
+                self.ideal[i] = value
+            if value > self.nadir[i]:
+                self.nadir[i] = value
+
+    def extent(self):
+        '''Sum of the ranges of the objectives covered by this node'''
+
+        return sum(nadir_value - ideal_value
+                   for ideal_value, nadir_value in zip(self.ideal, self.nadir))
+
+    def distance(self, solutions):
+        '''Squared distance between "solutions" and the middle of this node'''
+
+        middle = [(ideal_value + nadir_value) / 2
+                  for ideal_value, nadir_value in zip(self.ideal, self.nadir)]
+
+        return squared_distance(middle, solutions)
+
+class Archive():
+    '''External archive of non-dominated individuals found along the generations
+
+    Each insertion only visits the ND-tree nodes whose bounds allow the new individual to
+    dominate or be dominated by something inside, instead of scanning the whole archive.
+    When "max_size" is set and the archive goes beyond it, an individual of the most
+    crowded leaf, the one with lowest crowding distance inside it, is deleted in place'''
+
+    def __init__(self, max_size=None, max_leaf_size=20, children_quantity=None):
+
+        # Maximum quantity of individuals. None for an unbounded archive
+        self.max_size = max_size
+
+        # Maximum quantity of individuals of a leaf before it's split
+        self.max_leaf_size = max_leaf_size
+
+        # Quantity of children created when a leaf is split. None for "objectives + 1"
+        self.children_quantity = children_quantity
+
+        self.root = NDTreeNode()
+
+        self.size = 0
+
+    def insert(self, individual):
+        '''Insert "individual" if no one in the archive weakly dominates it, deleting
+        the ones it dominates. Return if it was inserted'''
+
+        if not self._add(individual):
+            return False
+
+        if self.max_size is not None and self.size > self.max_size:
+            self.truncate()
+
+        return True
+
+    def union(self, population):
+        '''Bulk insertion of all individuals of "population". Return how many were inserted'''
+
+        if not population.individuals:
+            return 0
+
+        # Only the first front of "population" can be non-dominated in the archive
+        solutions = [individual.solutions for individual in population.individuals]
+        first_front = kernels.non_dominated_sort(solutions)[0]
+
+        inserted = 0
+        for index in first_front:
+            if self._add(population.individuals[index]):
+                inserted += 1
+
+        if self.max_size is not None and self.size > self.max_size:
+            self.truncate()
+
+        return inserted
+
+    def get_individuals(self):
+        '''Return a list with all individuals of the archive'''
+
+        individuals = list()
+        nodes = [self.root]
+
+        while nodes:
+            node = nodes.pop()
+            individuals.extend(node.individuals)
+            nodes.extend(node.children)
+
+        return individuals
+
+    def truncate(self):
+        '''Delete individuals of the most crowded regions until there are only "max_size"'''
+
+        while self.size > self.max_size:
+            self._delete_most_crowded()
+
+    def _add(self, individual):
+        '''Insertion without the "max_size" check'''
+
+        solutions = individual.solutions
+
+        if self.size > 0:
+            if not self._update(self.root, solutions):
+                return False
+
+            if self.root.is_empty():
+                self.root = NDTreeNode()
+
+        self._insert(self.root, individual)
+        self.size += 1
+
+        return True
+
+    def _update(self, node, solutions):
+        '''Delete from "node" the individuals dominated by "solutions". Return False, without
+        changing anything, if "solutions" is weakly dominated by an individual of "node"'''
+
+        # Every individual of this node weakly dominates "solutions"
+        if weakly_dominates(node.nadir, solutions):
+            return False
+
+        # "solutions" dominates every individual of this node
+        if weakly_dominates(solutions, node.ideal):
+            self._delete_subtree(node)
+            return True
+
+        # No individual of this node can dominate or be dominated by "solutions"
+        if not (weakly_dominates(node.ideal, solutions) or weakly_dominates(solutions, node.nadir)):
+            return True
+
+        if node.is_leaf():
+            remaining = list()
+
+            for individual in node.individuals:
+                result = dominance_comparison(individual.solutions, solutions)
+
+                if result > 0 or (result == 0 and list(individual.solutions) == list(solutions)):
+                    return False
+                if result == 0:
+                    remaining.append(individual)
+
+            self.size -= len(node.individuals) - len(remaining)
+            node.individuals = remaining
+            node.size = len(remaining)
+
+            return True
+
+        for child in node.children:
+            if not self._update(child, solutions):
+                return False
+
+        node.children = [child for child in node.children if not child.is_empty()]
+        node.size = sum(child.size for child in node.children)
+
+        # A single child is merged into its parent
+        if len(node.children) == 1:
+            child = node.children[0]
+            node.individuals = child.individuals
+            node.children = child.children
+
+        return True
+
+    def _delete_subtree(self, node):
+        '''Delete every individual under "node"'''
+
+        nodes = [node]
+        while nodes:
+            current = nodes.pop()
+            self.size -= len(current.individuals)
+            nodes.extend(current.children)
+
+        node.individuals = list()
+        node.children = list()
+        node.size = 0
+
+    def _delete_most_crowded(self):
+        '''Delete an individual of the leaf reached by always descending into the child
+        with most individuals, narrowest in a tie. Inside the leaf, the one with lowest
+        crowding distance is deleted, so the extremes of the leaf are kept'''
+
+        path = [self.root]
+        while not path[-1].is_leaf():
+            path.append(max(path[-1].children, key=lambda child: (child.size, -child.extent())))
+
+        leaf = path[-1]
+        _, distances = kernels.crowding_distance([individual.solutions for individual in leaf.individuals])
+        del leaf.individuals[min(range(len(leaf.individuals)), key=lambda index: distances[index])]
+
+        for node in path:
+            node.size -= 1
+        self.size -= 1
+
+        if leaf.is_empty() and len(path) > 1:
+            parent = path[-2]
+            parent.children.remove(leaf)
+
+            # A single child is merged into its parent
+            if len(parent.children) == 1:
+                child = parent.children[0]
+                parent.individuals = child.individuals
+                parent.children = child.children
+
+    def _insert(self, node, individual):
+        '''Insert "individual" into the leaf closest to it'''
+
+        while not node.is_leaf():
+            node.update_bounds(individual.solutions)
+            node.size += 1
+            node = min(node.children, key=lambda child: child.distance(individual.solutions))
+
+        node.update_bounds(individual.solutions)
+        node.individuals.append(individual)
+        node.size += 1
+
+        if len(node.individuals) > self.max_leaf_size:
+            self._split(node)
+
+    def _split(self, node):
+        '''Split the individuals of a leaf "node" among new children'''
+
+        individuals = node.individuals
+        node.individuals = list()
+
+        children_quantity = self.children_quantity
+        if children_quantity is None:
+            children_quantity = len(individuals[0].solutions) + 1
+
+        # The first individual of each child is the one farthest, in average, from the
+        # individuals already placed. The first one is compared with everyone
+        placed = list(individuals)
+        remaining = list(individuals)
+        while remaining and len(node.children) < children_quantity:
+            farthest = max(remaining, key=lambda candidate: sum(
+                squared_distance(candidate.solutions, other.solutions) for other in placed))
+
+            child = NDTreeNode()
+            child.update_bounds(farthest.solutions)
+            child.individuals.append(farthest)
+            node.children.append(child)
+
+            remaining.remove(farthest)
+            placed = [child.individuals[0] for child in node.children]
+
+        for individual in remaining:
+            closest = min(node.children, key=lambda child: child.distance(individual.solutions))
+            closest.update_bounds(individual.solutions)
+            closest.individuals.append(individual)
+
+        for child in node.children:
+            child.size = len(child.individuals)
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+#
+# A implementation of: NSGA-II
+# Source: A fast and elitist multiobjective genetic algorithm: NSGA-II, 2002
+# Article author: DEB, K. et al.
+#
+# Instituto Federal de Minas Gerais - Campus Formiga, Brazil
+#
+# Version 1.0
+# (c) 2021 Thales Pinto <ThalesORP@gmail.com> under the GPL
+#          http://www.gnu.org/copyleft/gpl.html
+#
+
+'''File of batch runner class'''
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import csv
+import hashlib
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+def run_single(problem, configuration, seed):
+    '''Run "problem" (a NSGA2 heir class) once, with the NSGA2 arguments of
+    "configuration" and the random generator seeded with "seed"
+
+    Return the elapsed time and the genome and solutions of each individual of the best front'''
+
+    # Each process runs one task at a time, so seeding here isolates this run
+    random.seed(seed)
+
+    start = time.perf_counter()
+    best_front = problem(**configuration).run()
+    elapsed_time = time.perf_counter() - start
+
+    front = [(list(individual.genome), list(individual.solutions))
+             for individual in best_front.individuals]
+
+    return elapsed_time, front
+
+class BatchRunner():
+    '''Run every configuration of NSGA2 with every seed, over a pool of processes
+
+    Runs are submitted one by one, so an idle process always takes the next pending run
+    and long runs don't hold others back. Each finished run is appended to a single CSV
+    file, with one row per individual of its best front, so a sweep interrupted halfway
+    is resumed by running it again: the runs already in the file are skipped.
+
+    "problem" must be a NSGA2 heir class defined at module level, so it can be sent to
+    the other processes, and each configuration a dict with its constructor arguments'''
+
+    COLUMNS = ["run_id", "seed", "configuration", "elapsed_time",
+               "front_size", "individual", "genome", "solutions"]
+
+    def __init__(self, problem, configurations, seeds, results_path, workers=None):
+
+        self.problem = problem
+        self.configurations = configurations
+        self.seeds = seeds
+
+        # CSV file with the results, also used to resume the sweep
+        self.results_path = results_path
+
+        # Quantity of processes. None for the quantity of processors
+        self.workers = workers
+
+        # Runs that raised an error on the last call to "run", as run_id: (configuration, seed, error)
+        self.failed_runs = dict()
+
+    def get_runs(self):
+        '''Return all runs of the sweep as (run_id, configuration, seed)'''
+
+        runs = list()
+        for configuration in self.configurations:
+            for seed in self.seeds:
+                runs.append((self.get_run_id(configuration, seed), configuration, seed))
+
+        return runs
+
+    @staticmethod
+    def get_run_id(configuration, seed):
+        '''Identifier of a run, which doesn't depend on the order of the sweep'''
+
+        key = json.dumps([configuration, seed], sort_keys=True)
+
+        return hashlib.sha1(key.encode()).hexdigest()[:16]
+
+    def get_completed_runs(self):
+        '''Return the identifiers of the runs in the results file. Runs with missing or
+        broken rows, from an interrupted write, are deleted from the file so they're run again'''
+
+        if not os.path.exists(self.results_path):
+            return set()
+
+        with open(self.results_path, newline="") as results_file:
+            content = results_file.read()
+
+        rows = list(csv.DictReader(content.splitlines(keepends=True)))
+
+        # Every row is written with its line terminator, so without one the last row was cut
+        is_cut = bool(content) and not content.endswith("\n")
+
+        rows_by_run = dict()
+        for row in rows:
+            rows_by_run.setdefault(row["run_id"], list()).append(row)
+
+        completed = set(run_id for run_id, run_rows in rows_by_run.items()
+                        if self.is_complete_run(run_rows))
+
+        if is_cut and rows:
+            completed.discard(rows[-1]["run_id"])
+
+        if is_cut or len(completed) < len(rows_by_run):
+            # Written aside and then renamed, so an interruption here doesn't lose the results
+            directory = os.path.dirname(os.path.abspath(self.results_path))
+            with tempfile.NamedTemporaryFile("w", newline="", dir=directory, suffix=".csv",
+                                             delete=False) as results_file:
+                writer = csv.DictWriter(results_file, fieldnames=self.COLUMNS)
+                writer.writeheader()
+                writer.writerows(row for row in rows if row["run_id"] in completed)
+            os.replace(results_file.name, self.results_path)
+
+        return completed
+
+    def is_complete_run(self, run_rows):
+        '''Tell if "run_rows" are all the rows of a run, each one intact'''
+
+        try:
+            front_size = int(run_rows[0]["front_size"])
+            individuals = sorted(int(row["individual"]) for row in run_rows)
+
+            for row in run_rows:
+                # A cut row has its last columns missing, and a None key for extra values
+                if None in row or any(row.get(column) in (None, "") for column in self.COLUMNS):
+                    return False
+                if int(row["front_size"]) != front_size:
+                    return False
+                float(row["elapsed_time"])
+                json.loads(row["configuration"])
+                json.loads(row["genome"])
+                json.loads(row["solutions"])
+        except (TypeError, ValueError):
+            return False
+
+        return individuals == list(range(front_size))
+
+    def run(self):
+        '''Run every run not in the results file yet. Return how many were run successfully
+
+        A run that raises an error doesn't stop the others: it's reported on stderr, kept in
+        "failed_runs" and left out of the results file, so it's tried again on the next call'''
+
+        self.failed_runs = dict()
+
+        completed = self.get_completed_runs()
+        pending_runs = [run for run in self.get_runs() if run[0] not in completed]
+
+        if not os.path.exists(self.results_path):
+            with open(self.results_path, "w", newline="") as results_file:
+                csv.writer(results_file).writerow(self.COLUMNS)
+
+        if not pending_runs:
+            return 0
+
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            futures = dict()
+            for run_id, configuration, seed in pending_runs:
+                future = executor.submit(run_single, self.problem, configuration, seed)
+                futures[future] = (run_id, configuration, seed)
+
+            for future in as_completed(futures):
+                run_id, configuration, seed = futures[future]
+
+                try:
+                    elapsed_time, front = future.result()
+                except Exception as error: # pylint: disable=broad-except
+                    self.failed_runs[run_id] = (configuration, seed, error)
+                    sys.stderr.write("Run " + run_id + " (seed " + str(seed) + ", configuration "
+                                     + json.dumps(configuration, sort_keys=True) + ") failed: "
+                                     + repr(error) + "\n")
+                    continue
+
+                self.save(run_id, configuration, seed, elapsed_time, front)
+
+        return len(pending_runs) - len(self.failed_runs)
+
+    def save(self, run_id, configuration, seed, elapsed_time, front):
+        '''Append the rows of a finished run to the results file, at once'''
+
+        configuration = json.dumps(configuration, sort_keys=True)
+
+        with open(self.results_path, "a", newline="") as results_file:
+            writer = csv.writer(results_file)
+            writer.writerows([run_id, seed, configuration, elapsed_time, len(front), i,
+                              json.dumps(genome), json.dumps(solutions)]
+                             for i, (genome, solutions) in enumerate(front))
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+#
+# A implementation of: NSGA-II
+# Source: A fast and elitist multiobjective genetic algorithm: NSGA-II, 2002
+# Article author: DEB, K. et al.
+#
+# Instituto Federal de Minas Gerais - Campus Formiga, Brazil
+#
+# Version 1.0
+# (c) 2021 Thales Pinto <ThalesORP@gmail.com> under the GPL
+#          http://www.gnu.org/copyleft/gpl.html
+#
+
+'''File of blocked dominance class'''
+
+from array import array
+from sys import getsizeof
+
+def dominance_comparison(first_solutions, second_solutions):
+    '''Compare two solutions lists in a single pass
+
+    Return 1 when "first_solutions" dominates "second_solutions", -1 when it's
+    dominated by it, and 0 when none of them dominates the other'''
+
+    first_is_better = False
+    second_is_better = False
+
+    for first_value, second_value in zip(first_solutions, second_solutions):
+        if first_value < second_value:
+            first_is_better = True
+            if second_is_better:
+                return 0
+        elif second_value < first_value:
+            second_is_better = True
+            if first_is_better:
+                return 0
+
+    if first_is_better:
+        return 1
+    if second_is_better:
+        return -1
+    return 0
+
+class BlockedDominance():
+    '''Bounded-memory dominance computation for the fast non-dominated sort
+
+    Instead of a "dominated_by" list on each individual, the domination counts are kept
+    in an integer array and the sets of dominated individuals in CSR form: "indices"
+    holds the dominated indexes of all individuals, one after another, and the ones of
+    the i-th individual are in indices[indptr[i] : indptr[i+1]].
+
+    The population is processed in tiles of up to "tile_size" individuals. With a
+    "memory_limit", each tile is only as long as the worst case growth of the CSR arrays
+    still fits in it. When not even one more individual fits, the CSR arrays are dropped,
+    and the fronts are peeled by recomputing the dominance of each front against the
+    remaining individuals, which keeps memory in O(N) at the cost of about twice the
+    comparisons'''
+
+    # Typecode of individual indexes and counts
+    INDEX_TYPE = "i"
+
+    # Typecode of "indptr", which may need to address more than 2^31 dominated pairs
+    POINTER_TYPE = "q"
+
+    def __init__(self, tile_size=1024, memory_limit=None):
+
+        # Maximum amount of individuals processed between two memory checks. With a
+        # "memory_limit", tiles are shortened so a tile never goes beyond it
+        self.tile_size = tile_size
+
+        # Maximum size, in bytes, of the arrays and solutions held by the sort. None for unlimited.
+        # The solutions, counts and fronts take O(N) and are held anyway, so a limit below
+        # them only drops the dominated sets
+        self.memory_limit = memory_limit
+
+        # "csr" when the dominated sets were kept, "recompute" otherwise
+        self.mode = None
+
+        # Highest amount of bytes held by the arrays and solutions on the last sort
+        self.peak_memory = 0
+
+    def sort(self, individuals):
+        '''Sort "individuals" into fronts, returned as arrays of indexes of "individuals"'''
+
+        solutions = [tuple(individual.solutions) for individual in individuals]
+        size = len(solutions)
+
+        # The values themselves are shared with the individuals, only the containers are new
+        solutions_memory = getsizeof(solutions) + sum(getsizeof(values) for values in solutions)
+
+        self.mode = "csr"
+        self.peak_memory = 0
+
+        # "np" of each individual on NSGA-II paper
+        domination_count = array(self.INDEX_TYPE, [0]) * size
+
+        # "Sp" of each individual on NSGA-II paper
+        indptr = array(self.POINTER_TYPE, [0])
+        indices = array(self.INDEX_TYPE)
+
+        # Worst case growth of the arrays for each individual processed
+        row_memory = (size - 1) * indices.itemsize + indptr.itemsize
+
+        tile_start = 0
+        while tile_start < size:
+            tile_size = self.tile_size
+
+            if indices is not None and self.memory_limit is not None:
+                # The fronts will hold every index once more by the end of the sort
+                used_memory = (solutions_memory + size * domination_count.itemsize
+                               + self._measure(domination_count, indptr, indices))
+                tile_size = min(tile_size, (self.memory_limit - used_memory) // max(row_memory, 1))
+
+                if tile_size < 1:
+                    # Releasing the dominated sets, they will be recomputed front by front
+                    indptr = None
+                    indices = None
+                    self.mode = "recompute"
+                    tile_size = self.tile_size
+
+            for i in range(tile_start, min(tile_start + tile_size, size)):
+                current_solutions = solutions[i]
+
+                for j in range(size):
+                    if i == j: # Ignoring itself
+                        continue
+
+                    result = dominance_comparison(current_solutions, solutions[j])
+                    if result > 0:
+                        if indices is not None:
+                            indices.append(j)
+                    elif result < 0:
+                        domination_count[i] += 1
+
+                if indices is not None:
+                    indptr.append(len(indices))
+
+            tile_start += tile_size
+
+            self.peak_memory = max(self.peak_memory,
+                                   solutions_memory + self._measure(domination_count, indptr, indices))
+
+        fronts = list()
+        current_front = array(self.INDEX_TYPE,
+                              [i for i in range(size) if domination_count[i] == 0])
+
+        while current_front:
+            fronts.append(current_front)
+            next_front = array(self.INDEX_TYPE)
+
+            for i in current_front:
+                if indices is not None:
+                    dominated_indexes = (indices[k] for k in range(indptr[i], indptr[i+1]))
+                else:
+                    current_solutions = solutions[i]
+                    dominated_indexes = (j for j in range(size)
+                                         if domination_count[j] > 0
+                                         and dominance_comparison(current_solutions, solutions[j]) > 0)
+
+                for j in dominated_indexes:
+                    domination_count[j] -= 1
+
+                    # Now if this dominated individual aren't dominated by anyone, insert into next front
+                    if domination_count[j] == 0:
+                        next_front.append(j)
+
+            current_front = next_front
+
+        self.peak_memory = max(self.peak_memory, solutions_memory
+                               + self._measure(domination_count, indptr, indices, *fronts))
+
+        return fronts
+
+    @staticmethod
+    def _measure(*arrays):
+        '''Return the amount of bytes held by the items of "arrays", ignoring None'''
+
+        return sum(len(values) * values.itemsize for values in arrays if values is not None)
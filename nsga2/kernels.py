@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+#
+# A implementation of: NSGA-II
+# Source: A fast and elitist multiobjective genetic algorithm: NSGA-II, 2002
+# Article author: DEB, K. et al.
+#
+# Instituto Federal de Minas Gerais - Campus Formiga, Brazil
+#
+# Version 1.0
+# (c) 2021 Thales Pinto <ThalesORP@gmail.com> under the GPL
+#          http://www.gnu.org/copyleft/gpl.html
+#
+
+'''File of the loop-bound kernels of NSGA-II
+
+Each kernel has a pure-Python version, prefixed by "python_". When Numba is installed,
+a compiled version, prefixed by "numba_", is also built, and the unprefixed names point
+to it. Both versions give the same results for the same input'''
+
+from sys import maxsize
+
+from .dominance import dominance_comparison
+
+try:
+    import numpy
+    from numba import njit
+except ImportError:
+    njit = None
+
+# "numba" when the compiled kernels are in use, "python" otherwise
+BACKEND = "python" if njit is None else "numba"
+
+# EPS: precision error tolerance of the simulated binary crossover
+EPS = 1.0e-14
+
+def python_non_dominated_sort(solutions):
+    '''Sort the "solutions" lists into fronts, returned as lists of indexes
+
+    The fronts and the individuals inside them are in the same order given by
+    NSGA2.fast_non_dominated_sort, but each pair is compared only once'''
+
+    size = len(solutions)
+
+    domination_count = [0] * size
+    dominated = [list() for _ in range(size)]
+
+    for i in range(size):
+        for j in range(i+1, size):
+            result = dominance_comparison(solutions[i], solutions[j])
+            if result > 0:
+                dominated[i].append(j)
+                domination_count[j] += 1
+            elif result < 0:
+                dominated[j].append(i)
+                domination_count[i] += 1
+
+    fronts = list()
+    current_front = [i for i in range(size) if domination_count[i] == 0]
+
+    while current_front:
+        fronts.append(current_front)
+        next_front = list()
+
+        for i in current_front:
+            for j in dominated[i]:
+                domination_count[j] -= 1
+                if domination_count[j] == 0:
+                    next_front.append(j)
+
+        current_front = next_front
+
+    return fronts
+
+def python_crowding_distance(values):
+    '''Crowding distance of each row of "values" (one row per individual of a front)
+
+    Return the final order of the rows, sorted by the last column, and the distance of
+    each row. Ties keep the order of the previous column, as in a stable sort'''
+
+    size = len(values)
+    order = list(range(size))
+    distances = [0] * size
+
+    if size == 0:
+        return order, distances
+
+    last_index = size - 1
+
+    for column in range(len(values[0])):
+        order.sort(key=lambda row: values[row][column])
+
+        # The first and last individuals receive "infinite"
+        distances[order[0]] = maxsize
+        distances[order[last_index]] = maxsize
+
+        column_values = [row[column] for row in values]
+        value_range = max(column_values) - min(column_values)
+        if value_range == 0:
+            # TODO: warning: IN CROWDING DISTANCE: division by zero!
+            value_range = 1
+
+        for position in range(1, last_index):
+            right_neighbour_value = values[order[position+1]][column]
+            left_neighbour_value = values[order[position-1]][column]
+            distances[order[position]] += (right_neighbour_value - left_neighbour_value) / value_range
+
+    return order, distances
+
+def python_simulated_binary_crossover(genome1, genome2, lower_bounds, upper_bounds,
+                                      crossover_constant, random_values):
+    '''Simulated binary crossover (SBX) of two genomes
+
+    "random_values" has one uniform value in [0, 1) for each genotype'''
+
+    child1_genome = list()
+    child2_genome = list()
+
+    for j in range(len(genome1)):
+
+        # The paper is not very clear about this, but i assume, in the equation of beta (not beta_bar),
+        # y2 and y1, since they could not have been calculated yet, refer to the parents
+        # So, if both parents are equal at the specified variable, the divisor would be zero
+        # In this case, the children should have the same value as the parents.
+        if abs(genome1[j] - genome2[j]) <= EPS:
+            child1_genome.append(genome1[j])
+            child2_genome.append(genome2[j])
+            continue
+
+        # "y1" is the lowest value between parent1 and parent2. "y2" gets the other value
+        y1 = min(genome1[j], genome2[j])
+        y2 = max(genome1[j], genome2[j])
+
+        u = random_values[j]
+
+        beta = 1 + (2 / (y2 - y1)) * min((y1 - lower_bounds[j]), (upper_bounds[j] - y2))
+        alpha = 2 - pow(beta, -(crossover_constant + 1))
+        if u <= (1/alpha):
+            beta_bar = pow(alpha * u, 1/(crossover_constant + 1))
+        else:
+            beta_bar = pow(1/(2 - (alpha * u)), 1/(crossover_constant + 1))
+
+        child1_genome.append(0.5 * ((y1 + y2) - beta_bar * (y2 - y1)))
+        child2_genome.append(0.5 * ((y1 + y2) + beta_bar * (y2 - y1)))
+
+    return child1_genome, child2_genome
+
+non_dominated_sort = python_non_dominated_sort
+crowding_distance = python_crowding_distance
+simulated_binary_crossover = python_simulated_binary_crossover
+
+if njit is not None:
+
+    MAXSIZE = float(maxsize)
+
+    @njit(cache=True)
+    def _dominance_comparison(first_solutions, second_solutions):
+        '''Compiled version of dominance.dominance_comparison'''
+
+        first_is_better = False
+        second_is_better = False
+
+        for k in range(first_solutions.shape[0]):
+            if first_solutions[k] < second_solutions[k]:
+                first_is_better = True
+                if second_is_better:
+                    return 0
+            elif second_solutions[k] < first_solutions[k]:
+                second_is_better = True
+                if first_is_better:
+                    return 0
+
+        if first_is_better:
+            return 1
+        if second_is_better:
+            return -1
+        return 0
+
+    @njit(cache=True)
+    def _non_dominated_sort(solutions):
+        '''Return the individuals in front order, and the end position of each front'''
+
+        size = solutions.shape[0]
+
+        domination_count = numpy.zeros(size, numpy.int64)
+        dominated_count = numpy.zeros(size, numpy.int64)
+
+        # First pass: sizes of the dominated sets
+        for i in range(size):
+            for j in range(i+1, size):
+                result = _dominance_comparison(solutions[i], solutions[j])
+                if result > 0:
+                    dominated_count[i] += 1
+                    domination_count[j] += 1
+                elif result < 0:
+                    dominated_count[j] += 1
+                    domination_count[i] += 1
+
+        indptr = numpy.zeros(size + 1, numpy.int64)
+        indptr[1:] = numpy.cumsum(dominated_count)
+        indices = numpy.empty(indptr[size], numpy.int64)
+        filled = indptr[:size].copy()
+
+        # Second pass: filling the dominated sets, each one in ascending order
+        for i in range(size):
+            for j in range(i+1, size):
+                result = _dominance_comparison(solutions[i], solutions[j])
+                if result > 0:
+                    indices[filled[i]] = j
+                    filled[i] += 1
+                elif result < 0:
+                    indices[filled[j]] = i
+                    filled[j] += 1
+
+        order = numpy.empty(size, numpy.int64)
+        front_ends = numpy.empty(size, numpy.int64)
+
+        used = 0
+        for i in range(size):
+            if domination_count[i] == 0:
+                order[used] = i
+                used += 1
+
+        fronts_quantity = 0
+        front_start = 0
+        while front_start < used:
+            front_end = used
+            for position in range(front_start, front_end):
+                i = order[position]
+                for k in range(indptr[i], indptr[i+1]):
+                    j = indices[k]
+                    domination_count[j] -= 1
+                    if domination_count[j] == 0:
+                        order[used] = j
+                        used += 1
+            front_ends[fronts_quantity] = front_end
+            fronts_quantity += 1
+            front_start = front_end
+
+        return order, front_ends[:fronts_quantity]
+
+    @njit(cache=True)
+    def _crowding_distance(values):
+        '''Compiled version of python_crowding_distance'''
+
+        size = values.shape[0]
+        order = numpy.arange(size)
+        distances = numpy.zeros(size)
+
+        last_index = size - 1
+
+        for column in range(values.shape[1]):
+            order = order[numpy.argsort(values[order, column], kind="mergesort")]
+
+            distances[order[0]] = MAXSIZE
+            distances[order[last_index]] = MAXSIZE
+
+            value_range = values[:, column].max() - values[:, column].min()
+            if value_range == 0:
+                value_range = 1.0
+
+            for position in range(1, last_index):
+                distances[order[position]] += ((values[order[position+1], column]
+                                                - values[order[position-1], column])
+                                               / value_range)
+
+        return order, distances
+
+    @njit(cache=True)
+    def _simulated_binary_crossover(genome1, genome2, lower_bounds, upper_bounds,
+                                    crossover_constant, random_values):
+        '''Compiled version of python_simulated_binary_crossover'''
+
+        child1_genome = genome1.copy()
+        child2_genome = genome2.copy()
+
+        for j in range(genome1.shape[0]):
+            if abs(genome1[j] - genome2[j]) <= EPS:
+                continue
+
+            y1 = min(genome1[j], genome2[j])
+            y2 = max(genome1[j], genome2[j])
+
+            u = random_values[j]
+
+            beta = 1 + (2 / (y2 - y1)) * min((y1 - lower_bounds[j]), (upper_bounds[j] - y2))
+            alpha = 2 - beta ** -(crossover_constant + 1)
+            if u <= (1/alpha):
+                beta_bar = (alpha * u) ** (1/(crossover_constant + 1))
+            else:
+                beta_bar = (1/(2 - (alpha * u))) ** (1/(crossover_constant + 1))
+
+            child1_genome[j] = 0.5 * ((y1 + y2) - beta_bar * (y2 - y1))
+            child2_genome[j] = 0.5 * ((y1 + y2) + beta_bar * (y2 - y1))
+
+        return child1_genome, child2_genome
+
+    def numba_non_dominated_sort(solutions):
+        '''Numba version of python_non_dominated_sort'''
+
+        if len(solutions) == 0:
+            return list()
+
+        order, front_ends = _non_dominated_sort(numpy.asarray(solutions, dtype=numpy.float64))
+        order = order.tolist()
+
+        fronts = list()
+        front_start = 0
+        for front_end in front_ends.tolist():
+            fronts.append(order[front_start:front_end])
+            front_start = front_end
+
+        return fronts
+
+    def numba_crowding_distance(values):
+        '''Numba version of python_crowding_distance'''
+
+        if len(values) == 0:
+            return list(), list()
+
+        order, distances = _crowding_distance(numpy.asarray(values, dtype=numpy.float64))
+
+        return order.tolist(), distances.tolist()
+
+    def numba_simulated_binary_crossover(genome1, genome2, lower_bounds, upper_bounds,
+                                         crossover_constant, random_values):
+        '''Numba version of python_simulated_binary_crossover'''
+
+        child1_genome, child2_genome = _simulated_binary_crossover(
+            numpy.asarray(genome1, dtype=numpy.float64),
+            numpy.asarray(genome2, dtype=numpy.float64),
+            numpy.asarray(lower_bounds, dtype=numpy.float64),
+            numpy.asarray(upper_bounds, dtype=numpy.float64),
+            float(crossover_constant),
+            numpy.asarray(random_values, dtype=numpy.float64))
+
+        return child1_genome.tolist(), child2_genome.tolist()
+
+    non_dominated_sort = numba_non_dominated_sort
+    crowding_distance = numba_crowding_distance
+    simulated_binary_crossover = numba_simulated_binary_crossover
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+#
+# A implementation of: NSGA-II
+# Source: A fast and elitist multiobjective genetic algorithm: NSGA-II, 2002
+# Article author: DEB, K. et al.
+#
+# Instituto Federal de Minas Gerais - Campus Formiga, Brazil
+#
+# Version 1.0
+# (c) 2021 Thales Pinto <ThalesORP@gmail.com> under the GPL
+#          http://www.gnu.org/copyleft/gpl.html
+#
+
+'''File of reference niching class
+
+Survivors selection of NSGA-III, from: An evolutionary many-objective optimization
+algorithm using reference-point-based nondominated sorting approach, 2014.
+Article author: DEB, K.; JAIN, H.'''
+
+from math import comb, sqrt
+import random
+
+# Below this value, intercepts and pivots are taken as zero
+EPS = 1.0e-10
+
+def das_dennis_directions(objectives, divisions):
+    '''Return the points of the unit simplex with "divisions" parts on each objective'''
+
+    directions = list()
+
+    def fill(direction, remaining, objective):
+        if objective == objectives - 1:
+            directions.append(direction + [remaining / divisions])
+            return
+        for value in range(remaining + 1):
+            fill(direction + [value / divisions], remaining - value, objective + 1)
+
+    fill([], divisions, 0)
+
+    return directions
+
+def solve_linear_system(matrix, vector):
+    '''Gaussian elimination with partial pivoting. Return None when "matrix" is singular'''
+
+    size = len(matrix)
+    rows = [list(matrix[i]) + [vector[i]] for i in range(size)]
+
+    for column in range(size):
+        pivot = max(range(column, size), key=lambda row: abs(rows[row][column]))
+        if abs(rows[pivot][column]) < EPS:
+            return None
+        rows[column], rows[pivot] = rows[pivot], rows[column]
+
+        for row in range(column+1, size):
+            factor = rows[row][column] / rows[column][column]
+            for k in range(column, size+1):
+                rows[row][k] -= factor * rows[column][k]
+
+    result = [0] * size
+    for row in reversed(range(size)):
+        result[row] = (rows[row][size]
+                       - sum(rows[row][k] * result[k] for k in range(row+1, size))) / rows[row][row]
+
+    return result
+
+class ReferenceNiching():
+    '''Selection of the last front by niching around reference directions (NSGA-III)
+
+    With many objectives, almost everyone is in the first front and the crowding distance
+    gives poor selection pressure. Here, the solutions are normalized, each one is
+    associated to its closest reference direction by perpendicular distance, and the last
+    front individuals are chosen to fill the least crowded directions first'''
+
+    def __init__(self, directions=None, divisions=None):
+
+        # Reference points on the unit simplex. None to create them with "divisions"
+        self.directions = directions
+
+        # Parts on each objective of the Das and Dennis directions. None for the lowest
+        # value giving at least one direction per individual of the population
+        self.divisions = divisions
+
+    def get_directions(self, objectives, population_size):
+        '''Return the reference directions, creating them on the first call'''
+
+        if self.directions is None:
+            divisions = self.divisions
+            if divisions is None:
+                divisions = 1
+                while comb(divisions + objectives - 1, objectives - 1) < population_size:
+                    divisions += 1
+            self.directions = das_dennis_directions(objectives, divisions)
+
+        return self.directions
+
+    def select(self, chosen, last_front, amount, population_size):
+        '''Return "amount" individuals of "last_front", to be added to the "chosen" ones'''
+
+        candidates = chosen + last_front
+        objectives = len(candidates[0].solutions)
+        directions = self.get_directions(objectives, population_size)
+
+        normalized = self.normalize([individual.solutions for individual in candidates])
+
+        # Unit vectors of the reference directions
+        units = list()
+        for direction in directions:
+            norm = sqrt(sum(value * value for value in direction))
+            units.append([value / norm for value in direction])
+
+        # Closest direction of each candidate, by perpendicular distance
+        association = list()
+        distance = list()
+        for point in normalized:
+            squared_norm = sum(value * value for value in point)
+            best_direction = 0
+            best_distance = None
+            for j, unit in enumerate(units):
+                projection = sum(value * unit_value for value, unit_value in zip(point, unit))
+                perpendicular = squared_norm - projection * projection
+                if best_distance is None or perpendicular < best_distance:
+                    best_direction = j
+                    best_distance = perpendicular
+            association.append(best_direction)
+            distance.append(sqrt(max(best_distance, 0)))
+
+        # "rho" on NSGA-III paper: how many chosen individuals each direction has
+        niche_count = [0] * len(directions)
+        for index in range(len(chosen)):
+            niche_count[association[index]] += 1
+
+        # Last front individuals (as indexes of "candidates") associated to each direction
+        members = dict()
+        for index in range(len(chosen), len(candidates)):
+            members.setdefault(association[index], list()).append(index)
+
+        selected = list()
+        while len(selected) < amount:
+            lowest_count = min(niche_count[j] for j in members)
+            direction = random.choice([j for j in members if niche_count[j] == lowest_count])
+
+            direction_members = members[direction]
+            if niche_count[direction] == 0:
+                index = min(direction_members, key=lambda i: distance[i])
+            else:
+                index = random.choice(direction_members)
+
+            direction_members.remove(index)
+            if not direction_members:
+                del members[direction]
+
+            selected.append(candidates[index])
+            niche_count[direction] += 1
+
+        return selected
+
+    def normalize(self, solutions):
+        '''Translate "solutions" to the ideal point and divide them by the intercepts of the
+        hyperplane through the extreme points. The nadir point is used when there's no
+        such hyperplane'''
+
+        objectives = len(solutions[0])
+
+        ideal = [min(solution[k] for solution in solutions) for k in range(objectives)]
+        translated = [[solution[k] - ideal[k] for k in range(objectives)] for solution in solutions]
+
+        # Extreme point of each objective: the one with lowest achievement scalarizing function
+        extremes = list()
+        for axis in range(objectives):
+            weights = [1 if k == axis else 1.0e-6 for k in range(objectives)]
+            extremes.append(min(translated, key=lambda point: max(
+                value / weight for value, weight in zip(point, weights))))
+
+        intercepts = None
+        plane = solve_linear_system(extremes, [1] * objectives)
+        if plane is not None and all(value > EPS for value in plane):
+            intercepts = [1 / value for value in plane]
+
+        if intercepts is None:
+            intercepts = [max(point[k] for point in translated) for k in range(objectives)]
+
+        intercepts = [value if value > EPS else 1 for value in intercepts]
+
+        return [[point[k] / intercepts[k] for k in range(objectives)] for point in translated]
@@ -13,24 +13,33 @@
 
 '''Main class of NSGA-II'''
 
-from sys import maxsize
 import random
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 
-from .population import Population
+from .individual import Individual
+from .population import Population, is_per_genotype
+from .dominance import BlockedDominance
+from . import kernels
 
 class NSGA2():
     '''Main class of the NSGA-II algorithm'''
 
-    def __init__(self, generations, population_size, genome_min_value, genome_max_value, crossover_constant, crossover_rate):
+    def __init__(self, generations, population_size, genome_min_value, genome_max_value, crossover_constant, crossover_rate,
+                 genotype_quantity=None, genotype_types=None):
 
         self.generations = generations
 
         # "N" on NSGA-II paper
         self.population_size = population_size
 
+        # Single values, or lists with the lower and upper limit of each genotype
         self.genome_min_value = genome_min_value
         self.genome_max_value = genome_max_value
 
+        # "I" for integers and "R" for real values: single value, or a list with the type
+        # of each genotype. None to use Population.RANDOM_TYPE
+        self.genotype_types = genotype_types
+
         # Distribution index. "nc" in NSGA-II paper
         self.crossover_constant = crossover_constant
         #self.crossover_constant = 5
@@ -39,21 +48,57 @@ class NSGA2():
         self.crossover_rate = crossover_rate
         #self.crossover_rate = 0.9
 
-        # Size of genome list
+        # Size of genome list. When not given, it's the size of the lists of values per
+        # genotype, or 1 if there's none
         # Attention! For Genetic Quantum, this value must be 1
-        self.genotype_quantity = 1
-
-        # Mutation probability. "pm" in NSGA-II paper
+        if genotype_quantity is None:
+            genotype_quantity = 1
+            for value in (genome_min_value, genome_max_value, genotype_types):
+                if is_per_genotype(value):
+                    genotype_quantity = len(value)
+        self.genotype_quantity = genotype_quantity
+
+        # Mutation probability of each genotype. "pm" in NSGA-II paper
         self.mutation_rate = 1/self.genotype_quantity
 
-        # Percentage of chance to disturbing one genotype of genome
+        # Scales "mutation_rate": each genotype is disturbed with probability
+        # mutation_rate * genotype_mutation_probability. Set it to 1 for the "pm" of the paper
         self.genotype_mutation_probability = 0.5
 
         # Percentage to disturb each genotype mutated
         self.disturb_percent = 0.5
 
+        # Backend of fast_non_dominated_sort: "list" keeps the "dominated_by" list of each
+        # individual, as in the paper. "blocked" uses the bounded-memory arrays of
+        # BlockedDominance, meant for very large populations. "kernel" uses the
+        # compiled kernels, and is the default when Numba is installed
+        self.dominance_backend = "kernel" if kernels.BACKEND == "numba" else "list"
+
+        # Tile size, memory limit and peak memory report of the "blocked" backend
+        self.blocked_dominance = BlockedDominance()
+
+        # External archive of every non-dominated individual evaluated, see archive.py.
+        # None to disable it
+        self.archive = None
+
+        # Model of the solutions used to screen the offspring before "evaluate", see
+        # surrogate.py. None to evaluate every child created
+        self.surrogate = None
+
+        # How many times "N" children are created to be screened by the surrogate
+        self.surrogate_pool_factor = 4
+
+        # Survivors selection of the last front by reference directions, see niching.py.
+        # Meant for many-objective problems. None to use the crowding distance
+        self.reference_niching = None
+
         # "Rt" on NSGA-II paper
-        self.population = Population(self.genotype_quantity, self.genome_min_value, self.genome_max_value)
+        self.population = self.new_population()
+
+        # Lower and upper limit, and type, of each genotype
+        self.lower_bounds = self.population.lower_bounds
+        self.upper_bounds = self.population.upper_bounds
+        self.integer_genotypes = [genotype_type == "I" for genotype_type in self.population.genotype_types]
 
     def run(self):
         '''Method responsible for running the main loop of NSGA-II'''
@@ -67,6 +112,7 @@ class NSGA2():
         self.population.initiate(self.population_size//2)
 
         self.evaluate(self.population)
+        self.register_evaluation(self.population)
 
         fronts = self.fast_non_dominated_sort()
         #if debug: self._show_fronts(fronts)
@@ -74,6 +120,7 @@ class NSGA2():
         # "Q0" on NSGA-II paper
         offspring_population = self.usual_crossover()
         self.evaluate(offspring_population)
+        self.register_evaluation(offspring_population)
 
         best_front = None
 
@@ -98,33 +145,155 @@ class NSGA2():
                 next_population.union(fronts[i])
                 i += 1
 
-            # Sort(Fi, <n)
-            self.sort_by_crowded_comparison(fronts[i])
-
-            # "Pt+1" = "Pt+1" union fronts[i][1 : "N" - sizeof("Pt+1")]
             amount_to_insert = self.population_size - len(next_population.individuals)
-            fronts[i].individuals = fronts[i].individuals[:amount_to_insert]
+
+            if self.reference_niching is not None:
+                # NSGA-III: the individuals of the last front are chosen by niching
+                fronts[i].individuals = self.reference_niching.select(
+                    next_population.individuals, fronts[i].individuals,
+                    amount_to_insert, self.population_size)
+            else:
+                # Sort(Fi, <n)
+                self.sort_by_crowded_comparison(fronts[i])
+
+                # "Pt+1" = "Pt+1" union fronts[i][1 : "N" - sizeof("Pt+1")]
+                fronts[i].individuals = fronts[i].individuals[:amount_to_insert]
+
             next_population.union(fronts[i])
 
             self.population = next_population
 
             # Make new offspring population. "Qt+1" on NSGA-II paper
-            offspring_population = self.crossover()
+            if self.surrogate is not None and self.surrogate.is_ready():
+                offspring_population = self.screened_crossover()
+            else:
+                offspring_population = self.crossover()
             self.evaluate(offspring_population)
+            self.register_evaluation(offspring_population)
 
         if debug: print(self._show_population(best_front))
 
         return best_front
 
+    def run_steady_state(self, evaluations, executor=None):
+        '''Steady-state NSGA-II, for evaluations that finish at uneven times
+
+        Each individual is evaluated on its own, through "executor" (any executor from
+        concurrent.futures, a ThreadPoolExecutor by default). As soon as one finishes,
+        it's inserted into the fronts incrementally, the worst individual by rank and
+        crowding distance (or reference niching, when set) is deleted, and a new child is
+        dispatched right away. The archive and the surrogate get every evaluated individual.
+        "evaluations" is the total quantity of evaluations, including the first population'''
+
+        if evaluations < 1:
+            raise ValueError("At least one evaluation is needed, got " + str(evaluations))
+
+        own_executor = executor is None
+        if own_executor:
+            executor = ThreadPoolExecutor()
+
+        self.population = self.new_population()
+        self.population.reset_fronts()
+
+        # Individuals waiting to be dispatched, starting with a random population
+        waiting = self.new_population()
+        waiting.initiate(min(self.population_size, evaluations))
+        waiting = waiting.individuals
+
+        dispatched = 0
+        pending = set()
+
+        try:
+            while waiting:
+                pending.add(executor.submit(self.evaluate_individual, waiting.pop(0)))
+                dispatched += 1
+
+            while pending:
+                finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+
+                for future in finished:
+                    individual = future.result()
+
+                    self.steady_state_insert(individual)
+
+                    evaluated = self.new_population()
+                    evaluated.insert(individual)
+                    self.register_evaluation(evaluated)
+
+                    if dispatched < evaluations:
+                        if not waiting:
+                            waiting = [Individual(self.mutation(genome))
+                                       for genome in self.crossover_genomes()]
+                        pending.add(executor.submit(self.evaluate_individual, waiting.pop(0)))
+                        dispatched += 1
+        finally:
+            if own_executor:
+                executor.shutdown()
+
+        best_front = self.new_population()
+        for individual in self.population.fronts[0]:
+            best_front.insert(individual)
+
+        return best_front
+
+    def steady_state_insert(self, individual):
+        '''Insert "individual" into the population, updating the fronts incrementally, and
+        delete the worst one by rank and crowding distance if the population got too big.
+        With reference niching, the one left out by it on the last front is deleted instead'''
+
+        fronts = self.population.fronts
+
+        first_changed_front = self.population.insert_into_fronts(individual)
+
+        if self.population.size > self.population_size:
+            last_front = self.population.get_last_front()
+
+            if self.reference_niching is not None:
+                chosen = [x for front in fronts[:-1] for x in front]
+                kept = self.reference_niching.select(chosen, last_front, len(last_front) - 1,
+                                                     self.population_size)
+                worst = next(x for x in last_front if x not in kept)
+            else:
+                fronts[-1] = last_front = self.assign_crowding_distance(last_front)
+                worst = min(last_front, key=lambda x: x.crowding_distance)
+            self.population.delete_individual_from_last_front(worst)
+
+            if not last_front:
+                self.population.delete_last_front()
+
+        for i in range(first_changed_front, len(fronts)):
+            fronts[i] = self.assign_crowding_distance(fronts[i])
+
     def evaluate(self, population):
         '''This method should be implemented by the heir class'''
 
         pass
 
+    def evaluate_individual(self, individual):
+        '''Evaluate only "individual" and return it. Used by run_steady_state
+        By default, "evaluate" is called over a population with only this individual'''
+
+        population = self.new_population()
+        population.insert(individual)
+        self.evaluate(population)
+
+        return individual
+
+    def register_evaluation(self, population):
+        '''Insert the evaluated "population" into the external archive and into the
+        surrogate history, when there are ones'''
+
+        if self.archive is not None:
+            self.archive.union(population)
+
+        if self.surrogate is not None:
+            self.surrogate.add(population)
+
     def new_population(self):
         '''Return a empty Population object'''
 
-        return Population(self.genotype_quantity, self.genome_min_value, self.genome_max_value)
+        return Population(self.genotype_quantity, self.genome_min_value, self.genome_max_value,
+                          self.genotype_types)
 
     def fast_non_dominated_sort(self):
         '''Sort the individuals according to they dominance and sort them into fronts
@@ -133,6 +302,11 @@ class NSGA2():
         Also, the first front is created
         Then the remaining individuals are divided into fronts'''
 
+        if self.dominance_backend == "blocked":
+            return self.blocked_non_dominated_sort()
+        if self.dominance_backend == "kernel":
+            return self.kernel_non_dominated_sort()
+
         self.population.reset_fronts()
 
         # Initializing the fronts list and the first front
@@ -182,69 +356,81 @@ class NSGA2():
 
         return fronts
 
-    def crowding_distance_assignment(self, fronts):
-        '''Calculates the crowding distance value of each individual'''
+    def blocked_non_dominated_sort(self):
+        '''Same as fast_non_dominated_sort, but the domination counts and the dominated
+        individuals are kept in the compact arrays of BlockedDominance, which are released
+        once the fronts are peeled'''
 
-        for population in fronts:
+        self.population.reset_fronts()
+
+        individuals = self.population.individuals
 
-            last_individual_index = len(population.individuals)-1
+        fronts = list()
+        for rank, front_indexes in enumerate(self.blocked_dominance.sort(individuals), 1):
+            front = self.new_population()
+            for index in front_indexes:
+                individuals[index].rank = rank
+                front.insert(individuals[index])
+            fronts.append(front)
+
+        return fronts
+
+    def kernel_non_dominated_sort(self):
+        '''Same as fast_non_dominated_sort, but using kernels.non_dominated_sort,
+        which doesn't fill the "dominated_by" list of the individuals'''
+
+        self.population.reset_fronts()
+
+        individuals = self.population.individuals
+        solutions = [individual.solutions for individual in individuals]
 
-            # Reseting this value because it's a new generation
-            for individual in population.individuals:
-                individual.crowding_distance = 0
+        fronts = list()
+        for rank, front_indexes in enumerate(kernels.non_dominated_sort(solutions), 1):
+            front = self.new_population()
+            for index in front_indexes:
+                individuals[index].rank = rank
+                front.insert(individuals[index])
+            fronts.append(front)
+
+        return fronts
+
+    def crowding_distance_assignment(self, fronts):
+        '''Calculates the crowding distance value of each individual'''
 
-            genome_index = 0
-            for genome_index in range(self.genotype_quantity):
+        for population in fronts:
+            population.individuals = self.assign_crowding_distance(population.individuals)
 
-                # Sorting current population (front) according to the current objective (genome)
-                population.individuals.sort(key=lambda x: x.genome[genome_index])
+    def assign_crowding_distance(self, individuals):
+        '''Calculates the crowding distance value of each individual of a single front.
+        Return the individuals sorted according to the last objective'''
 
-                # The first and last individuals of current population (front) receive "infinite"
-                population.individuals[0].crowding_distance = maxsize
-                population.individuals[last_individual_index].crowding_distance = maxsize
+        # One row per individual of current front, one column per objective. The solutions
+        # are used, as in the paper: the genome may have thousands of genotypes, and its
+        # spread says nothing about the spread of the front
+        values = [individual.solutions for individual in individuals]
 
-                min_value, max_value = population.get_extreme_neighbours(genome_index)
+        order, distances = kernels.crowding_distance(values)
 
-                # Calculating the crowding distance of each objective (genome) of all individuals
-                for i in range(1, last_individual_index):
-                    right_neighbour_value = population.individuals[i+1].genome[genome_index]
-                    left_neighbour_value = population.individuals[i-1].genome[genome_index]
+        for index in order:
+            individuals[index].crowding_distance = distances[index]
 
-                    # population.individuals[i].crowding_distance += ((right_neighbour_value - left_neighbour_value) / (max_value - min_value))
-                    if (max_value - min_value) == 0:
-                        # TODO: warning: IN CROWDING DISTANCE: division by zero!
-                        #print("IN CROWDING DISTANCE: division by zero!")
-                        population.individuals[i].crowding_distance += ((right_neighbour_value - left_neighbour_value) / 1)
-                    else:
-                        population.individuals[i].crowding_distance += ((right_neighbour_value - left_neighbour_value) / (max_value - min_value))
+        return [individuals[index] for index in order]
 
     def crowded_comparison(self, individual_A, individual_B):
         '''Return the best individual according to the crowded comparison operator
         in NSGA-II paper'''
 
         if ((individual_A.rank < individual_B.rank)
-            or ((individual_A == individual_B)
+            or ((individual_A.rank == individual_B.rank)
             and (individual_A.crowding_distance > individual_B.crowding_distance))):
             return individual_A
         return individual_B
 
     def sort_by_crowded_comparison(self, population):
-        '''Sort "population" with crowded comparison operator. Bubble sort'''
-
-        for i in range(len(population.individuals)-2):
-
-            worst = population.individuals[i]
-
-            for j in range(1, len(population.individuals)-i):
+        '''Sort "population" with crowded comparison operator, best individuals first'''
 
-                worst = self.crowded_comparison(worst, population.individuals[j])
-
-            population.individuals.remove(worst)
-            population.individuals.append(worst)
-
-        worst = population.individuals[0]
-        population.individuals.remove(worst)
-        population.individuals.append(worst)
+        # Lower rank first and, on the same rank, higher crowding distance first
+        population.individuals.sort(key=lambda x: (x.rank, -x.crowding_distance))
 
     def tournament_selection(self):
         '''Binary tournament selection according to crowded comparison operator'''
@@ -287,20 +473,7 @@ class NSGA2():
 
         # "step = 2" because each iteration generates two children
         for i in range(0, amount_to_create, 2):
-
-            parent1 = self.tournament_selection()
-            parent2 = self.tournament_selection()
-
-            # Checking if crossover will or not be made
-            if random.random() > self.crossover_rate:
-                # When crossover isn't made, the children will be a clone of the parents
-                child1_genome = parent1.genome
-                child2_genome = parent2.genome
-            else:
-                child1_genome, child2_genome = self.simulated_binary_crossover(parent1, parent2)
-
-            genomes_list.append(child1_genome)
-            genomes_list.append(child2_genome)
+            genomes_list.extend(self.crossover_genomes())
 
         # Creating the offspring population
         offspring_population = self.new_population()
@@ -311,6 +484,50 @@ class NSGA2():
 
         return offspring_population
 
+    def screened_crossover(self):
+        '''Create "surrogate_pool_factor" offspring populations with crossover, and keep
+        only the "N" best children according to the solutions predicted by the surrogate,
+        using the same rank and crowding distance criteria of the survivors selection'''
+
+        candidates = self.new_population()
+        for _ in range(self.surrogate_pool_factor):
+            candidates.union(self.crossover())
+
+        predictions = [self.surrogate.predict(individual.genome) for individual in candidates.individuals]
+
+        offspring_population = self.new_population()
+
+        for front_indexes in kernels.non_dominated_sort(predictions):
+
+            amount_to_insert = self.population_size - offspring_population.size
+            if len(front_indexes) > amount_to_insert:
+                # Crowding distance over the predicted solutions of this front
+                _, distances = kernels.crowding_distance([predictions[index] for index in front_indexes])
+                positions = sorted(range(len(front_indexes)), key=lambda i: distances[i], reverse=True)
+                front_indexes = [front_indexes[i] for i in positions[:amount_to_insert]]
+
+            for index in front_indexes:
+                offspring_population.insert(candidates.individuals[index])
+
+            if offspring_population.size == self.population_size:
+                break
+
+        return offspring_population
+
+    def crossover_genomes(self):
+        '''Return the genomes of two children, not mutated yet, of parents chosen by the
+        binary tournament selection according to the crowded comparison operator'''
+
+        parent1 = self.tournament_selection()
+        parent2 = self.tournament_selection()
+
+        # Checking if crossover will or not be made
+        if random.random() > self.crossover_rate:
+            # When crossover isn't made, the children will be a clone of the parents
+            return list(parent1.genome), list(parent2.genome)
+
+        return self.simulated_binary_crossover(parent1, parent2)
+
     def usual_crossover(self):
         '''Create a offspring population using the simulated binary crossover (SBX)
         and the usual binary tournament selection'''
@@ -344,88 +561,24 @@ class NSGA2():
     def simulated_binary_crossover(self, parent1, parent2):
         '''Simulated binary crossover (SBX)'''
 
-        # Distribution index. "nc" in NSGA-II paper
-        crossover_constant = self.crossover_constant
-
-        child1_genome = list()
-        child2_genome = list()
-
-        for j in range(self.genotype_quantity):
+        # "u" of each genotype
+        random_values = [random.random() for _ in range(self.genotype_quantity)]
 
-            # Each genotype has a 50% chance of changing its value
-            # TODO: This should be removed when dealing with one-dimensional solutions
-            '''
-            if (random.random() > 0.5) and (self.genotype_quantity != 1):
-                # In this case, the children will get the value of the parents
-                child1_genome.append(parent1.genome[j])
-                child2_genome.append(parent2.genome[j])
-                continue
-            '''
-
-            # "y1" is the lowest value between parent1 and parent2. "y2" gets the other value
-            if (parent1.genome[j] < parent2.genome[j]):
-                y1 = parent1.genome[j]
-                y2 = parent2.genome[j]
-            else:
-                y1 = parent2.genome[j]
-                y2 = parent1.genome[j]
-
-            # EPS: precision error tolerance, its value is 1.0e-14 (global constant)
-            eps = 0.000000000000010 #1.0e-14
-            # If the value in parent1 is not the same of parent2
-            if abs(parent1.genome[j] - parent2.genome[j]) > eps:
-                # Lower and upper limit of genotype of an individual
-                lower_bound = self.genome_min_value
-                upper_bound = self.genome_max_value
-
-                u = random.random()
-
-                # Calculation of the first child
-                beta = 1 + (2 / (y2 - y1)) * min((y1 - lower_bound), (upper_bound - y2))
-                alpha = 2 - pow(beta, -(crossover_constant + 1))
-                if u <= (1/alpha):
-                    beta_bar = pow(alpha * u, 1/(crossover_constant + 1))
-                else:
-                    beta_bar = pow(1/(2 - (alpha * u)), 1/(crossover_constant + 1))
-                child1_genotype = 0.5 * ((y1 + y2) - beta_bar * (y2 - y1))
-
-                # Calculation of the second child
-                beta = 1 + (2 / (y2 - y1)) * min((y1 - lower_bound), (upper_bound - y2))
-                alpha = 2 - pow(beta, -(crossover_constant + 1))
-                if u <= (1/alpha):
-                    beta_bar = pow(alpha * u, 1/(crossover_constant + 1))
-                else:
-                    beta_bar = pow(1/(2 - (alpha * u)), 1/(crossover_constant + 1))
-                child2_genotype = 0.5 * ((y1 + y2) + beta_bar * (y2 - y1))
-
-                child1_genome.append(child1_genotype)
-                child2_genome.append(child2_genotype)
-
-            # The paper is not very clear about this, but i assume, in the equation of beta (not beta_bar),
-            # y2 and y1, since they could not have been calculated yet, refer to the parents
-            # So, if both parents are equal at the specified variable, the divisor would be zero
-            # In this case, the children should have the same value as the parents. 
-            else:
-                child1_genome.append(parent1.genome[j])
-                child2_genome.append(parent2.genome[j])
-
-        return child1_genome, child2_genome
+        # Distribution index. "nc" in NSGA-II paper
+        return kernels.simulated_binary_crossover(parent1.genome, parent2.genome,
+                                                  self.lower_bounds, self.upper_bounds,
+                                                  self.crossover_constant, random_values)
 
     def mutation(self, genome):
-        '''Mutation method'''
+        '''Mutation method. Every genome returned is inside the bounds, and its integer
+        genotypes are rounded, since they may have been changed by the crossover too'''
 
-        random.seed()
-
-        value = random.random()
-        value = random.uniform(0, 1)
-        # Checking if mutation will or not occur
-        if value > self.mutation_rate:
-            # When mutation doesn't occur, nothing happens
-            return genome
+        # Same average of genotypes mutated per genome, whatever the genome size
+        genotype_probability = self.mutation_rate * self.genotype_mutation_probability
 
         for i in range(len(genome)):
             # Mutate that genotype
-            if random.random() < self.genotype_mutation_probability:
+            if random.random() < genotype_probability:
 
                 value = self.disturb_percent * genome[i]
 
@@ -435,13 +588,16 @@ class NSGA2():
 
                 genome[i] = genome[i] + value
 
-                # Making sure that it doesn't escape the bounds
-                if genome[i] > self.genome_max_value:
-                    genome[i] = self.genome_max_value
-                elif genome[i] < self.genome_min_value:
-                    genome[i] = self.genome_min_value
+        return self.repair(genome)
+
+    def repair(self, genome):
+        '''Return "genome" clipped into the bounds, with its integer genotypes rounded'''
+
+        genome = [min(max(value, lower_bound), upper_bound)
+                  for value, lower_bound, upper_bound in zip(genome, self.lower_bounds, self.upper_bounds)]
 
-        return genome
+        return [int(round(value)) if integer else value
+                for value, integer in zip(genome, self.integer_genotypes)]
 
     # Utils
     def _show_fronts(self, fronts):
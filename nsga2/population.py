@@ -18,21 +18,58 @@ import random
 
 from .individual import Individual
 
+def is_per_genotype(value):
+    '''Tell if "value" is a sequence with one value per genotype (a list, tuple,
+    array.array, NumPy array...) instead of a single value. Strings are single values'''
+
+    return (hasattr(value, "__len__") and not isinstance(value, str)
+            and getattr(value, "ndim", 1) > 0)
+
+def genotype_values(value, genotype_quantity):
+    '''Return "value" as a list with one item per genotype. "value" may be a single value,
+    used by every genotype, or a sequence with the value of each genotype'''
+
+    if is_per_genotype(value):
+        if len(value) != genotype_quantity:
+            raise ValueError("Expected " + str(genotype_quantity) + " values, one per genotype, got "
+                             + str(len(value)))
+        return list(value)
+
+    return [value] * genotype_quantity
+
 class Population():
     '''Class of population of indiviuals, used by NSGA-II'''
 
-    # "I" for integers and "R" for real values
+    # "I" for integers and "R" for real values. Used when the type of each genotype isn't given
     RANDOM_TYPE = "R"
 
-    def __init__(self, genotype_quantity, genome_min_value, genome_max_value):
-        random.seed()
+    def __init__(self, genotype_quantity, genome_min_value, genome_max_value, genotype_types=None):
 
         # Size of genome list
         self.genotype_quantity = genotype_quantity
 
+        # Single values or lists with the value of each genotype
         self.genome_min_value = genome_min_value
         self.genome_max_value = genome_max_value
 
+        # Lower and upper limit of each genotype
+        self.lower_bounds = genotype_values(genome_min_value, genotype_quantity)
+        self.upper_bounds = genotype_values(genome_max_value, genotype_quantity)
+
+        for i, (lower_bound, upper_bound) in enumerate(zip(self.lower_bounds, self.upper_bounds)):
+            if lower_bound > upper_bound:
+                raise ValueError("Lower bound " + str(lower_bound) + " is greater than upper bound "
+                                 + str(upper_bound) + " on genotype " + str(i))
+
+        # "I" or "R" for each genotype
+        if genotype_types is None:
+            genotype_types = self.RANDOM_TYPE
+        self.genotype_types = genotype_values(genotype_types, genotype_quantity)
+
+        for i, genotype_type in enumerate(self.genotype_types):
+            if genotype_type not in ("I", "R"):
+                raise ValueError("Unknown type " + repr(genotype_type) + " on genotype " + str(i))
+
         self.size = 0
 
         self.individuals = list()
@@ -40,15 +77,12 @@ class Population():
     def initiate(self, n_individuals):
         '''Initialize a new population'''
 
-        for _ in range(n_individuals):
-            genome = list()
+        genotypes = list(zip(self.lower_bounds, self.upper_bounds, self.genotype_types))
 
-            for _ in range(self.genotype_quantity):
-                if self.RANDOM_TYPE == "R":
-                    genotype = random.uniform(self.genome_min_value, self.genome_max_value)
-                if self.RANDOM_TYPE == "I":
-                    genotype = random.randrange(self.genome_min_value, self.genome_max_value + 1)
-                genome.append(genotype)
+        for _ in range(n_individuals):
+            genome = [random.uniform(lower_bound, upper_bound) if genotype_type == "R"
+                      else random.randrange(lower_bound, upper_bound + 1)
+                      for lower_bound, upper_bound, genotype_type in genotypes]
 
             self.new_individual(genome)
 
@@ -85,6 +119,41 @@ class Population():
 
         self.fronts = list()
 
+    def insert_into_fronts(self, individual):
+        '''Insert "individual" into population and into its front, without sorting everyone
+        again. The individuals of that front dominated by it go down one front, pushing
+        down the ones they dominate, and so on. Return the index of the first front changed'''
+
+        self.insert(individual)
+
+        # First front where no one dominates the individual
+        index = 0
+        while (index < len(self.fronts)
+               and any(other.dominates(individual) for other in self.fronts[index])):
+            index += 1
+
+        first_changed_front = index
+
+        moving = [individual]
+        while moving:
+            if index == len(self.fronts):
+                self.new_front()
+
+            dominated = [other for other in self.fronts[index]
+                         if any(current.dominates(other) for current in moving)]
+
+            self.fronts[index] = [other for other in self.fronts[index]
+                                  if not any(other is current for current in dominated)]
+
+            for current in moving:
+                current.rank = index + 1
+                self.add_to_front(index, current)
+
+            moving = dominated
+            index += 1
+
+        return first_changed_front
+
     def new_front(self):
         '''Start a new front'''
 
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+#
+# A implementation of: NSGA-II
+# Source: A fast and elitist multiobjective genetic algorithm: NSGA-II, 2002
+# Article author: DEB, K. et al.
+#
+# Instituto Federal de Minas Gerais - Campus Formiga, Brazil
+#
+# Version 1.0
+# (c) 2021 Thales Pinto <ThalesORP@gmail.com> under the GPL
+#          http://www.gnu.org/copyleft/gpl.html
+#
+
+'''File of surrogate class'''
+
+from math import exp, sqrt
+
+def cholesky_solve(matrix, vectors):
+    '''Solve "matrix" * x = v for each v in "vectors". "matrix" must be symmetric positive
+    definite, and it's overwritten by its Cholesky factor'''
+
+    size = len(matrix)
+
+    # matrix = L * L^T, with L stored in the lower triangle
+    for i in range(size):
+        for j in range(i+1):
+            value = matrix[i][j] - sum(matrix[i][k] * matrix[j][k] for k in range(j))
+            if i == j:
+                # Rounding errors may leave an almost singular matrix slightly negative here
+                matrix[i][i] = sqrt(max(value, 1.0e-12))
+            else:
+                matrix[i][j] = value / matrix[j][j]
+
+    results = list()
+    for vector in vectors:
+        # L * y = v
+        y = list()
+        for i in range(size):
+            y.append((vector[i] - sum(matrix[i][k] * y[k] for k in range(i))) / matrix[i][i])
+
+        # L^T * x = y
+        x = [0] * size
+        for i in reversed(range(size)):
+            x[i] = (y[i] - sum(matrix[k][i] * x[k] for k in range(i+1, size))) / matrix[i][i]
+
+        results.append(x)
+
+    return results
+
+class RBFSurrogate():
+    '''Gaussian radial basis function regression of the solutions of the individuals
+
+    It's trained with the latest "max_samples" evaluated individuals and predicts the
+    solutions of new ones from their genomes, so the offspring can be screened before the
+    real evaluation. The fit is O(max_samples^3), so this value should stay small'''
+
+    def __init__(self, max_samples=100, regularization=1.0e-6):
+
+        # Quantity of latest evaluated individuals used to fit the model
+        self.max_samples = max_samples
+
+        # Added to the diagonal, so repeated genomes don't make the system singular
+        self.regularization = regularization
+
+        # Evaluation history, with the latest "max_samples" individuals
+        self.genomes = list()
+        self.solutions = list()
+
+        # Fitted model
+        self.centers = None
+        self.weights = None
+        self.means = None
+        self.width = None
+
+    def add(self, population):
+        '''Add the evaluated individuals of "population" to the history'''
+
+        for individual in population.individuals:
+            self.genomes.append(list(individual.genome))
+            self.solutions.append(list(individual.solutions))
+
+        # Only the latest "max_samples" are ever used to fit the model
+        del self.genomes[:-self.max_samples]
+        del self.solutions[:-self.max_samples]
+
+        # The model is fitted again on the next prediction
+        self.centers = None
+
+    def is_ready(self):
+        '''Tell if there's enough history to predict'''
+
+        return len(self.genomes) >= 2
+
+    def fit(self):
+        '''Fit the model with the history'''
+
+        self.centers = list(self.genomes)
+        solutions = self.solutions
+        size = len(self.centers)
+
+        distances = [[sqrt(sum((a - b) ** 2 for a, b in zip(self.centers[i], self.centers[j])))
+                      for j in range(size)] for i in range(size)]
+
+        # Width of the gaussians: mean distance between the centers
+        self.width = sum(map(sum, distances)) / (size * (size - 1))
+        if self.width == 0:
+            self.width = 1
+
+        matrix = [[exp(-(distances[i][j] / self.width) ** 2) for j in range(size)]
+                  for i in range(size)]
+        for i in range(size):
+            matrix[i][i] += self.regularization
+
+        # Each objective is fitted around its mean
+        objectives = range(len(solutions[0]))
+        self.means = [sum(solution[k] for solution in solutions) / size for k in objectives]
+        targets = [[solution[k] - self.means[k] for solution in solutions] for k in objectives]
+
+        self.weights = cholesky_solve(matrix, targets)
+
+    def predict(self, genome):
+        '''Return the predicted solutions of "genome"'''
+
+        if self.centers is None:
+            self.fit()
+
+        basis = [exp(-(sqrt(sum((a - b) ** 2 for a, b in zip(genome, center))) / self.width) ** 2)
+                 for center in self.centers]
+
+        return [mean + sum(w * phi for w, phi in zip(weights, basis))
+                for mean, weights in zip(self.means, self.weights)]
@@ -0,0 +1,78 @@
+'''Tests of the batch runner'''
+
+import csv
+import os
+import tempfile
+import unittest
+
+from nsga2.batch import BatchRunner
+from nsga2.nsga2 import NSGA2
+
+class Schaffer(NSGA2):
+    '''Schaffer's problem, at module level so it can be sent to the other processes'''
+
+    def evaluate(self, population):
+        for individual in population.individuals:
+            x = individual.genome[0]
+            individual.solutions = [x ** 2, (x - 2) ** 2]
+
+class TestResume(unittest.TestCase):
+    '''A sweep interrupted while writing must be resumed without the broken run'''
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.results_path = os.path.join(self.directory.name, "results.csv")
+
+        configurations = [dict(generations=3, population_size=8, genome_min_value=-10,
+                               genome_max_value=10, crossover_constant=20, crossover_rate=0.9)]
+        self.runner = BatchRunner(Schaffer, configurations, [1, 2, 3], self.results_path, workers=1)
+
+        self.assertEqual(self.runner.run(), 3)
+
+        with open(self.results_path, newline="") as results_file:
+            self.content = results_file.read()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def read_rows(self):
+        with open(self.results_path, newline="") as results_file:
+            return list(csv.DictReader(results_file))
+
+    def resume(self, content):
+        '''Resume from the results file with "content", return how many runs were run again'''
+
+        with open(self.results_path, "w", newline="") as results_file:
+            results_file.write(content)
+
+        return self.runner.run()
+
+    def assert_complete(self):
+        rows = self.read_rows()
+        runs = dict()
+        for row in rows:
+            runs.setdefault(row["run_id"], list()).append(row)
+
+        self.assertEqual(set(runs), set(run[0] for run in self.runner.get_runs()))
+        for run_rows in runs.values():
+            self.assertTrue(self.runner.is_complete_run(run_rows))
+
+    def test_last_row_cut(self):
+        for cut in (1, 5, 2):
+            self.assertEqual(self.resume(self.content[:-cut]), 1)
+            self.assert_complete()
+
+    def test_first_row_cut(self):
+        last_run_id = self.read_rows()[-1]["run_id"]
+        first_row_start = self.content.index("\r\n" + last_run_id) + 2
+
+        for length in (3, 30):
+            self.assertEqual(self.resume(self.content[:first_row_start + length]), 1)
+            self.assert_complete()
+
+    def test_nothing_cut(self):
+        self.assertEqual(self.resume(self.content), 0)
+        self.assertEqual(self.read_rows(), list(csv.DictReader(self.content.splitlines(keepends=True))))
+
+if __name__ == "__main__":
+    unittest.main()
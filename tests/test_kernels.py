@@ -0,0 +1,110 @@
+'''Tests of the kernels and of the backends of the fast non-dominated sort'''
+
+import random
+import unittest
+
+from nsga2 import kernels
+from nsga2.dominance import dominance_comparison
+from nsga2.individual import Individual
+from nsga2.nsga2 import NSGA2
+
+def random_solutions(size, objectives, seed):
+    '''Integer solutions in a small range, so there are many ties'''
+
+    generator = random.Random(seed)
+
+    return [[generator.randint(0, 4) for _ in range(objectives)] for _ in range(size)]
+
+class TestDominanceComparison(unittest.TestCase):
+    '''dominance_comparison against Individual.dominates'''
+
+    def test_same_as_dominates(self):
+        solutions = random_solutions(40, 3, 1)
+        individuals = [Individual([0]) for _ in solutions]
+        for individual, values in zip(individuals, solutions):
+            individual.solutions = values
+
+        for first in individuals:
+            for second in individuals:
+                expected = 1 if first.dominates(second) else -1 if second.dominates(first) else 0
+                self.assertEqual(dominance_comparison(first.solutions, second.solutions), expected)
+
+@unittest.skipUnless(kernels.BACKEND == "numba", "Numba isn't installed")
+class TestNumbaKernels(unittest.TestCase):
+    '''The compiled kernels must give the same results of the pure-Python ones'''
+
+    def test_non_dominated_sort(self):
+        for seed in range(20):
+            solutions = random_solutions(60, 2 + seed % 3, seed)
+            self.assertEqual(kernels.numba_non_dominated_sort(solutions),
+                             kernels.python_non_dominated_sort(solutions))
+
+    def test_crowding_distance(self):
+        for seed in range(20):
+            # Genomes with repeated values, so the sort stability matters
+            values = random_solutions(1 + seed * 3, 1 + seed % 3, seed)
+
+            python_order, python_distances = kernels.python_crowding_distance(values)
+            numba_order, numba_distances = kernels.numba_crowding_distance(values)
+
+            self.assertEqual(numba_order, python_order)
+            self.assertEqual(numba_distances, [float(distance) for distance in python_distances])
+
+    def test_simulated_binary_crossover(self):
+        generator = random.Random(0)
+
+        for _ in range(50):
+            size = generator.randint(1, 10)
+            lower_bounds = [generator.uniform(-10, 0) for _ in range(size)]
+            upper_bounds = [generator.uniform(1, 10) for _ in range(size)]
+            genome1 = [generator.uniform(lower, upper) for lower, upper in zip(lower_bounds, upper_bounds)]
+            # Some equal genotypes, which aren't crossed
+            genome2 = [value if generator.random() < 0.3 else generator.uniform(lower, upper)
+                       for value, lower, upper in zip(genome1, lower_bounds, upper_bounds)]
+            random_values = [generator.random() for _ in range(size)]
+
+            arguments = (genome1, genome2, lower_bounds, upper_bounds, 20, random_values)
+            python_children = kernels.python_simulated_binary_crossover(*arguments)
+            numba_children = kernels.numba_simulated_binary_crossover(*arguments)
+
+            for python_child, numba_child in zip(python_children, numba_children):
+                for python_value, numba_value in zip(python_child, numba_child):
+                    self.assertAlmostEqual(python_value, numba_value, places=12)
+
+class TestDominanceBackends(unittest.TestCase):
+    '''Every backend of fast_non_dominated_sort must give the fronts of the "list" one'''
+
+    def sort(self, solutions, backend, **blocked_options):
+        '''Return the names in each front, and the rank of each individual'''
+
+        Individual.id = 1
+
+        nsga2 = NSGA2(1, len(solutions), 0, 1, 20, 0.9)
+        nsga2.dominance_backend = backend
+        for option, value in blocked_options.items():
+            setattr(nsga2.blocked_dominance, option, value)
+
+        for values in solutions:
+            nsga2.population.new_individual([0])
+            nsga2.population.individuals[-1].solutions = values
+
+        fronts = nsga2.fast_non_dominated_sort()
+
+        names = [[individual.name for individual in front.individuals] for front in fronts]
+        ranks = [individual.rank for individual in nsga2.population.individuals]
+
+        return names, ranks
+
+    def test_backends(self):
+        for seed in range(15):
+            solutions = random_solutions(50, 2 + seed % 3, seed)
+            expected = self.sort(solutions, "list")
+
+            self.assertEqual(self.sort(solutions, "kernel"), expected)
+            self.assertEqual(self.sort(solutions, "blocked", tile_size=7), expected)
+
+            # A limit this low forces the fronts to be recomputed
+            self.assertEqual(self.sort(solutions, "blocked", memory_limit=1), expected)
+
+if __name__ == "__main__":
+    unittest.main()